@@ -0,0 +1,219 @@
+"""
+Client-side benchmarks for the encode, decode and transport hot paths
+
+Run with ``python -m pytest benchmarks``. Every case records its best wall
+time over a few repeats, the resulting rows/s and the peak RSS of the
+process while it ran. ``--bench-output`` writes them as JSON, so that runs
+can be compared across commits.
+
+Cases going through the stand-in server report the time it spent serving
+calls, response serialization included, as ``server_seconds`` and compute
+rows/s from the remaining client time.
+"""
+
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.conftest import (  # noqa
+    _geo_columns,
+    _numeric_columns,
+    _temporal_columns,
+    _text_columns,
+    fake_con,
+    fake_server,
+)
+
+COLUMN_TYPES = ['numeric', 'temporal', 'text']
+# column group only benchmarked by tests marked ``geo``
+GEO_COLUMNS = ('point_', 'poly_', 'mpoly_')
+NULL_DENSITIES = [0.0, 0.1]
+
+_RESULTS = []
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--bench-rows',
+        default='1000,10000',
+        help='Comma separated row counts to benchmark with',
+    )
+    parser.addoption(
+        '--bench-repeat',
+        default=3,
+        type=int,
+        help='Number of timed runs per case, the best one is kept',
+    )
+    parser.addoption(
+        '--bench-output',
+        default=None,
+        help='Write the benchmark results as JSON to this path',
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', 'geo: also benchmark the geo column group'
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if 'n_rows' in metafunc.fixturenames:
+        rows = metafunc.config.getoption('--bench-rows')
+        metafunc.parametrize('n_rows', [int(n) for n in rows.split(',')])
+    if 'column_types' in metafunc.fixturenames:
+        column_types = list(COLUMN_TYPES)
+        if metafunc.definition.get_closest_marker('geo'):
+            column_types.append('geo')
+        metafunc.parametrize('column_types', column_types)
+    if 'null_density' in metafunc.fixturenames:
+        metafunc.parametrize('null_density', NULL_DENSITIES)
+
+
+def _reset_peak_rss():
+    """Reset the kernel's RSS high-water mark, Linux only"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+@pytest.fixture
+def bench(request):
+    """
+    Time a callable, returns a function ``bench(func, n_rows, server=None)``
+    recording the best of ``--bench-repeat`` runs of ``func()`` for this test
+    case. Time the stand-in ``server`` spent decoding requests, running its
+    handlers and encoding responses is reported separately and left out of
+    rows/s.
+    """
+    repeat = request.config.getoption('--bench-repeat')
+
+    def run(func, n_rows, server=None):
+        _reset_peak_rss()
+        timings = []
+        for _ in range(repeat):
+            server_start = server.server_seconds if server else 0.0
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            in_server = server.server_seconds - server_start if server else 0.0
+            timings.append((elapsed - in_server, elapsed, in_server))
+        client, seconds, in_server = min(timings)
+        result = {
+            'name': request.node.name,
+            'rows': n_rows,
+            'seconds': seconds,
+            'server_seconds': in_server,
+            'rows_per_s': n_rows / client,
+            'peak_rss_bytes': _peak_rss(),
+        }
+        _RESULTS.append(result)
+        return result
+
+    return run
+
+
+def make_frame(n_rows, column_types, null_density=0.0):
+    """
+    Build a DataFrame of ``n_rows`` with the ``column_types`` group of the
+    columns generated by ``tests.conftest._tests_table_no_nulls``
+
+    A ``null_density`` fraction of the float, temporal and text values is
+    set to null. Integer, boolean and geo columns stay non-null, pandas has
+    no null for the former without changing the OmniSci type they map to.
+    """
+    # gen_string draws from the random module
+    np.random.seed(12345)
+    random.seed(12345)
+
+    if column_types == 'numeric':
+        columns = _numeric_columns(n_rows)
+        nullable = ['float_', 'double_']
+    elif column_types == 'temporal':
+        columns = _temporal_columns(n_rows)
+        # datetime64 rather than datetime objects, so that the loaders infer
+        # TIMESTAMP for it
+        columns['datetime_'] = pd.to_datetime(columns['datetime_'])
+        nullable = list(columns)
+    elif column_types == 'text':
+        columns = _text_columns(n_rows)
+        nullable = list(columns)
+    elif column_types == 'geo':
+        # the data files hold 10000 shapes, repeat them for larger frames
+        columns = {
+            col: np.resize(values, n_rows)
+            for col, values in _geo_columns(n_rows, GEO_COLUMNS).items()
+        }
+        nullable = []
+    else:
+        raise ValueError(column_types)
+    df = pd.DataFrame(columns)
+
+    if null_density:
+        for col in nullable:
+            mask = np.random.random_sample(n_rows) < null_density
+            # keep one valid value so the column type can be inferred
+            mask[0] = False
+            df[col] = df[col].where(~mask, None)
+    return df
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            universal_newlines=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _RESULTS:
+        return
+    terminalreporter.section('benchmarks')
+    for r in _RESULTS:
+        terminalreporter.write_line(
+            '{name:<70} {rows_per_s:>14,.0f} rows/s '
+            '{server_seconds:>8.4f} s server '
+            '{peak_rss_bytes:>14,d} B peak RSS'.format(**r)
+        )
+    path = config.getoption('--bench-output')
+    if path:
+        with open(path, 'w') as f:
+            json.dump(
+                {
+                    'revision': _git_revision(),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'results': _RESULTS,
+                },
+                f,
+                indent=2,
+            )
+        terminalreporter.write_line('results written to {}'.format(path))
@@ -0,0 +1,38 @@
+"""Result set decoding and fetching through the stand-in server"""
+
+from pymapd.cursor import make_row_results_set
+
+from .conftest import make_frame
+
+QUERY = 'select * from bench'
+
+
+def test_make_row_results_set(
+    bench, fake_server, n_rows, column_types, null_density
+):
+    fake_server.add_table(
+        'bench', make_frame(n_rows, column_types, null_density)
+    )
+    # decode only, take the TQueryResult straight from the handler
+    handler = fake_server.handler
+    session = handler.connect(handler.user, handler.password, 'omnisci')
+    result = handler.sql_execute(session, QUERY, True, None, -1, -1)
+    bench(lambda: list(make_row_results_set(result)), n_rows)
+
+
+def test_fetchall(
+    bench, fake_server, fake_con, n_rows, column_types, null_density
+):
+    fake_server.add_table(
+        'bench', make_frame(n_rows, column_types, null_density)
+    )
+    bench(lambda: fake_con.execute(QUERY).fetchall(), n_rows, fake_server)
+
+
+def test_select_ipc(
+    bench, fake_server, fake_con, n_rows, column_types, null_density
+):
+    fake_server.add_table(
+        'bench', make_frame(n_rows, column_types, null_density)
+    )
+    bench(lambda: fake_con.select_ipc(QUERY), n_rows, fake_server)
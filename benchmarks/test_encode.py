@@ -0,0 +1,40 @@
+"""Client-side encoding of load payloads"""
+
+import pytest
+from pymapd._loaders import _build_input_rows
+from pymapd._pandas_loaders import build_input_columnar
+from pyomnisci._pandas_loaders import _serialize_arrow_payload
+
+from .conftest import make_frame
+
+
+@pytest.mark.geo
+def test_build_input_rows(bench, n_rows, column_types):
+    # the row-wise loader has no null encoding, so no null_density here
+    data = list(
+        make_frame(n_rows, column_types).itertuples(index=False, name=None)
+    )
+    bench(lambda: _build_input_rows(data), n_rows)
+
+
+def test_build_input_columnar(
+    bench, fake_server, fake_con, n_rows, column_types, null_density
+):
+    df = make_frame(n_rows, column_types, null_density)
+    # column details as load_table_columnar gets them from the server
+    fake_server.add_table('bench', df)
+    col_types = fake_con.get_table_details('bench')
+    bench(
+        lambda: build_input_columnar(
+            df, preserve_index=False, col_types=col_types, col_names=list(df)
+        ),
+        n_rows,
+    )
+
+
+def test_serialize_arrow_payload(bench, n_rows, column_types, null_density):
+    df = make_frame(n_rows, column_types, null_density)
+    bench(
+        lambda: _serialize_arrow_payload(df, None, preserve_index=False),
+        n_rows,
+    )
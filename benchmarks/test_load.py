@@ -0,0 +1,30 @@
+"""End-to-end ``load_table`` through the stand-in server"""
+
+import pytest
+import shapely.wkt
+
+from .conftest import make_frame
+
+
+@pytest.mark.geo
+@pytest.mark.parametrize('method', ['rows', 'columnar', 'arrow'])
+def test_load_table(
+    bench, fake_server, fake_con, n_rows, column_types, null_density, method
+):
+    if method == 'rows' and null_density:
+        pytest.skip("the row-wise loader does not encode nulls")
+    if column_types == 'geo' and method != 'rows':
+        pytest.skip("geo columns are loaded with the row-wise loader")
+    df = make_frame(n_rows, column_types, null_density)
+    # WKT strings would be inferred as TEXT, create the geo table from
+    # shapely objects and load the WKT into it
+    schema = df.applymap(shapely.wkt.loads) if column_types == 'geo' else df
+    fake_con.create_table('bench', schema)
+    # measure the client: the server neither decodes nor keeps the payload,
+    # so the table does not grow across repeats
+    fake_server.handler.sink = True
+    bench(
+        lambda: fake_con.load_table('bench', df, create=False, method=method),
+        n_rows,
+        fake_server,
+    )
@@ -1,4 +1,8 @@
-from pyomnisci import *
+from . import _lazy
+
+# Everything is resolved from pyomnisci on first attribute access, so that
+# ``import pymapd`` does not pull in pandas, pyarrow, thrift and sqlalchemy
+__getattr__, __dir__ = _lazy.lazy_exports(globals(), star=('pyomnisci',))
 
 
 def _deprication_warning():
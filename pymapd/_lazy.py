@@ -0,0 +1,59 @@
+from importlib import import_module
+
+
+def lazy_exports(namespace, star=(), names=None):
+    """
+    Build a module-level ``__getattr__`` and ``__dir__`` (PEP 562) that
+    resolve re-exported names on first access instead of at import time
+
+    Parameters
+    ----------
+    namespace: dict
+        ``globals()`` of the shim module, resolved names are cached here
+    star: sequence of str
+        Modules whose public names are re-exported, as with
+        ``from module import *``. Earlier modules take precedence.
+    names: dict, optional
+        Mapping of explicitly re-exported (typically private) names to the
+        module that provides them
+    """
+    names = names or {}
+
+    def _public():
+        public = set()
+        for source in star:
+            public.update(
+                n for n in vars(import_module(source)) if not n.startswith('_')
+            )
+        return sorted(public)
+
+    def __getattr__(name):
+        if name == '__all__':
+            value = _public()
+        elif name in names:
+            value = getattr(import_module(names[name]), name)
+        elif name.startswith('_'):
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(
+                    namespace['__name__'], name
+                )
+            )
+        else:
+            for source in star:
+                module = import_module(source)
+                if hasattr(module, name):
+                    value = getattr(module, name)
+                    break
+            else:
+                raise AttributeError(
+                    "module {!r} has no attribute {!r}".format(
+                        namespace['__name__'], name
+                    )
+                )
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(names) | set(_public()))
+
+    return __getattr__, __dir__
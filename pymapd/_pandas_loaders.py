@@ -1 +1,5 @@
-from pyomnisci._pandas_loaders import *
+from . import _lazy
+
+__getattr__, __dir__ = _lazy.lazy_exports(
+    globals(), star=('pyomnisci._pandas_loaders',)
+)
@@ -1,6 +1,13 @@
-from omnisci.connection import *
-from omnisci.connection import _parse_uri
-from pyomnisci.connection import *
-from omnisci._parsers import _bind_parameters, _extract_column_details
-from pyomnisci._transforms import _change_dashboard_sources
-from pyomnisci._loaders import _build_input_rows
+from . import _lazy
+
+__getattr__, __dir__ = _lazy.lazy_exports(
+    globals(),
+    star=('pyomnisci.connection', 'omnisci.connection'),
+    names={
+        '_parse_uri': 'omnisci.connection',
+        '_bind_parameters': 'omnisci._parsers',
+        '_extract_column_details': 'omnisci._parsers',
+        '_change_dashboard_sources': 'pyomnisci._transforms',
+        '_build_input_rows': 'pyomnisci._loaders',
+    },
+)
@@ -1,2 +1,7 @@
-from omnisci.cursor import *
-from omnisci._parsers import _bind_parameters
+from . import _lazy
+
+__getattr__, __dir__ = _lazy.lazy_exports(
+    globals(),
+    star=('omnisci.cursor',),
+    names={'_bind_parameters': 'omnisci._parsers'},
+)
@@ -1,3 +1,4 @@
+import os
 import subprocess
 import time
 from uuid import uuid4
@@ -104,14 +105,8 @@ def gen_string():
     )
 
 
-def _tests_table_no_nulls(n_samples):
-    """
-    Generates a dataframe with all OmniSci types in it for use in integration
-    testing
-    """
-
-    np.random.seed(12345)
-
+def _numeric_columns(n_samples):
+    """Integer, floating point and boolean columns of _tests_table_no_nulls"""
     tinyint_ = np.random.randint(
         low=-127, high=127, size=n_samples, dtype='int8'
     )
@@ -138,6 +133,19 @@ def _tests_table_no_nulls(n_samples):
 
     bool_ = np.random.randint(low=0, high=2, size=n_samples, dtype='bool')
 
+    return {
+        'tinyint_': tinyint_,
+        'smallint_': smallint_,
+        'int_': int_,
+        'bigint_': bigint_,
+        'float_': float_,
+        'double_': double_,
+        'bool_': bool_,
+    }
+
+
+def _temporal_columns(n_samples):
+    """Date, datetime and time columns of _tests_table_no_nulls"""
     # effective date range of 1904 to 2035
     # TODO: validate if this is an Arrow limitation, outside this range fails
     date_ = [
@@ -156,39 +164,53 @@ def _tests_table_no_nulls(n_samples):
     time_s = np.random.randint(0, 60, size=n_samples)
     time_ = [datetime.time(h, m, s) for h, m, s in zip(time_h, time_m, time_s)]
 
+    return {'date_': date_, 'datetime_': datetime_, 'time_': time_}
+
+
+def _text_columns(n_samples):
+    """Text column of _tests_table_no_nulls"""
     # generate random text strings
-    text_ = [gen_string() for x in range(n_samples)]
+    return {'text_': [gen_string() for x in range(n_samples)]}
+
 
+GEO_FILES = {
+    'point_': 'points_10000.zip',
+    'line_': 'lines_10000.zip',
+    'mpoly_': 'mpoly_10000.zip',
+    'poly_': 'polys_10000.zip',
+}
+
+
+def _geo_columns(n_samples, columns=tuple(GEO_FILES)):
+    """
+    WKT geo columns of _tests_table_no_nulls, at most 10000 rows are
+    available in the data files
+    """
     # read geo data from files
-    point_ = pd.read_csv("tests/data/points_10000.zip", header=None).values
-    point_ = np.squeeze(point_)
+    here = os.path.dirname(__file__)
+    return {
+        col: np.squeeze(
+            pd.read_csv(
+                os.path.join(here, 'data', GEO_FILES[col]), header=None
+            ).values
+        )[:n_samples]
+        for col in columns
+    }
 
-    line_ = pd.read_csv("tests/data/lines_10000.zip", header=None).values
-    line_ = np.squeeze(line_)
 
-    mpoly_ = pd.read_csv("tests/data/mpoly_10000.zip", header=None).values
-    mpoly_ = np.squeeze(mpoly_)
+def _tests_table_no_nulls(n_samples):
+    """
+    Generates a dataframe with all OmniSci types in it for use in integration
+    testing
+    """
 
-    poly_ = pd.read_csv("tests/data/polys_10000.zip", header=None).values
-    poly_ = np.squeeze(poly_)
+    np.random.seed(12345)
 
-    d = {
-        'tinyint_': tinyint_,
-        'smallint_': smallint_,
-        'int_': int_,
-        'bigint_': bigint_,
-        'float_': float_,
-        'double_': double_,
-        'bool_': bool_,
-        'date_': date_,
-        'datetime_': datetime_,
-        'time_': time_,
-        'text_': text_,
-        'point_': point_,
-        'line_': line_,
-        'mpoly_': mpoly_,
-        'poly_': poly_,
-    }
+    d = {}
+    d.update(_numeric_columns(n_samples))
+    d.update(_temporal_columns(n_samples))
+    d.update(_text_columns(n_samples))
+    d.update(_geo_columns(n_samples))
 
     return pd.DataFrame(d)
 
@@ -202,3 +224,31 @@ def tmp_table(con) -> str:
         yield table_name
     finally:
         con.execute("drop table if exists {};".format(table_name))
+
+
+@pytest.fixture
+def fake_server():
+    """In-process stand-in OmniSci server, see tests/fake_server.py"""
+    from .fake_server import FakeOmniSciServer
+
+    with FakeOmniSciServer() as server:
+        yield server
+
+
+@pytest.fixture
+def fake_con(fake_server):
+    """
+    Fixture to provide Connection for tests run against the stand-in server
+    """
+    con = connect(
+        user="admin",
+        password='HyperInteractive',
+        host=fake_server.host,
+        port=fake_server.port,
+        protocol='binary',
+        dbname='omnisci',
+    )
+    try:
+        yield con
+    finally:
+        con.close()
@@ -0,0 +1,609 @@
+"""
+In-process stand-in for the OmniSci Thrift server
+
+Implements the subset of the ``OmniSci`` service used by the client so that
+connection, decode and load paths can be exercised without Docker or a real
+``omnisci/core-os-cpu`` image. Tables are kept in memory; query results are
+either registered up front with :meth:`FakeOmniSciServer.add_result` or read
+back with ``select * from <table>``. Array columns are supported on every
+load and result path.
+
+Results are encoded once and cached, so that answering a query costs the
+server little beyond writing the response to the socket. The time spent
+serving calls, from decoding the request through the handler to writing the
+response, is accumulated in :attr:`FakeOmniSciServer.server_seconds` for
+callers that need to tell it apart from the client's own work.
+"""
+
+import datetime
+import re
+import socket
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from thrift.protocol import TBinaryProtocol
+from thrift.transport import TSocket, TTransport
+from omnisci.common.ttypes import TDatumType, TEncodingType
+from omnisci.thrift import OmniSci
+from omnisci.thrift.ttypes import (
+    TArrowTransport,
+    TColumn,
+    TColumnData,
+    TDataFrame,
+    TOmniSciException,
+    TQueryResult,
+    TRowSet,
+    TTableDetails,
+)
+from pymapd._pandas_loaders import build_row_desc
+from pymapd._parsers import _extract_col_vals, _typeattr
+
+_SELECT_ALL = re.compile(r'^select \* from (\w+);?$', re.IGNORECASE)
+_DROP_TABLE = re.compile(r'^drop table (if exists )?(\w+);?$', re.IGNORECASE)
+
+_NULL_SLOT = {'int_col': 0, 'real_col': 0.0, 'str_col': ''}
+
+# Arrow types of the select_ipc result columns, text and geo are strings
+_ARROW_TYPES = {
+    'TINYINT': pa.int8(),
+    'SMALLINT': pa.int16(),
+    'INT': pa.int32(),
+    'BIGINT': pa.int64(),
+    'FLOAT': pa.float32(),
+    'DOUBLE': pa.float64(),
+    'DECIMAL': pa.float64(),
+    'BOOL': pa.bool_(),
+    'DATE': pa.date32(),
+    'TIME': pa.time64('us'),
+}
+_TIMESTAMP_UNITS = {0: 's', 3: 'ms', 6: 'us', 9: 'ns'}
+
+
+def _normalize(query):
+    return ' '.join(query.split())
+
+
+def _value(value):
+    """Normalize a cell read from pandas, ``None`` for nulls"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return None if pd.isna(value) else value
+
+
+def _coerce(typename, precision, value):
+    """
+    Convert a loaded value to what a column of ``typename`` stores, so that
+    the contents do not depend on the load method
+    """
+    if value is None:
+        return None
+    if typename == 'TIMESTAMP':
+        unit = 10 ** (9 - precision)
+        return pd.Timestamp(pd.Timestamp(value).value // unit * unit)
+    elif typename == 'DATE':
+        return value.date() if isinstance(value, datetime.datetime) else value
+    elif typename == 'TIME':
+        return value.replace(microsecond=0)
+    elif typename == 'BOOL':
+        return bool(value)
+    elif _typeattr[typename] == 'str':
+        return value if isinstance(value, str) else value.wkt
+    elif _typeattr[typename] == 'real':
+        return float(value)
+    return int(value)
+
+
+def _to_slot(typename, precision, value):
+    """Encode a python value the way the server sends it in a TColumn"""
+    if typename == 'TIMESTAMP':
+        return pd.Timestamp(value).value // 10 ** (9 - precision)
+    elif typename == 'DATE':
+        return (value - datetime.date(1970, 1, 1)).days * 86400
+    elif typename == 'TIME':
+        return 3600 * value.hour + 60 * value.minute + value.second
+    elif _typeattr[typename] == 'str':
+        return value if isinstance(value, str) else value.wkt
+    elif _typeattr[typename] == 'real':
+        return float(value)
+    return int(value)
+
+
+def _from_string(typename, value):
+    """Parse a TStringValue sent by the row-wise loader"""
+    if typename == 'TIMESTAMP':
+        return pd.Timestamp(value).to_pydatetime()
+    elif typename == 'DATE':
+        return datetime.date.fromisoformat(value)
+    elif typename == 'TIME':
+        return datetime.time.fromisoformat(value)
+    elif typename == 'BOOL':
+        return value.lower() in ('true', 't', '1')
+    elif _typeattr[typename] == 'real':
+        return float(value)
+    elif _typeattr[typename] == 'int':
+        return int(value)
+    return value
+
+
+def _array_from_string(typename, value):
+    """Parse a ``{a,b}`` array literal sent by the row-wise loader"""
+    value = value.strip('{}')
+    if not value:
+        return []
+    return [_from_string(typename, v) for v in value.split(',')]
+
+
+class _Table:
+    """A table or canned result: its row descriptor and column values"""
+
+    def __init__(self, row_desc, columns=None):
+        # fill in the type attributes a real server always reports
+        for tct in row_desc:
+            col_type = tct.col_type
+            if col_type.nullable is None:
+                col_type.nullable = True
+            col_type.is_array = bool(col_type.is_array)
+            col_type.encoding = col_type.encoding or TEncodingType.NONE
+            col_type.precision = col_type.precision or 0
+            col_type.scale = col_type.scale or 0
+            col_type.comp_param = col_type.comp_param or 0
+        self.row_desc = row_desc
+        self.columns = columns or [[] for _ in row_desc]
+        self._row_set = None
+        self._arrow_stream = None
+
+    @classmethod
+    def from_dataframe(cls, df):
+        table = cls(build_row_desc(df))
+        table.append(
+            [_value(v) for v in df[col].tolist()] for col in df.columns
+        )
+        return table
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def head(self, n):
+        """The first ``n`` rows, all of them when ``n`` is negative"""
+        if n < 0 or n >= len(self):
+            return self
+        return _Table(self.row_desc, [values[:n] for values in self.columns])
+
+    def _typename(self, desc):
+        return TDatumType._VALUES_TO_NAMES[desc.col_type.type]
+
+    def _arrow_field(self, desc):
+        typename = self._typename(desc)
+        col_type = desc.col_type
+        if typename == 'TIMESTAMP':
+            arrow_type = pa.timestamp(_TIMESTAMP_UNITS[col_type.precision])
+        else:
+            arrow_type = _ARROW_TYPES.get(typename, pa.string())
+        if col_type.is_array:
+            arrow_type = pa.list_(arrow_type)
+        return pa.field(desc.col_name, arrow_type, col_type.nullable)
+
+    def append(self, columns):
+        for desc, existing, new in zip(self.row_desc, self.columns, columns):
+            typename = self._typename(desc)
+            precision = desc.col_type.precision
+            if desc.col_type.is_array:
+                existing.extend(
+                    None
+                    if v is None
+                    else [_coerce(typename, precision, x) for x in v]
+                    for v in new
+                )
+            else:
+                existing.extend(_coerce(typename, precision, v) for v in new)
+        self._row_set = None
+        self._arrow_stream = None
+
+    def encode(self):
+        """Encode the result formats up front rather than on first query"""
+        self.to_row_set()
+        self.to_arrow_stream()
+        return self
+
+    def append_columnar(self, cols):
+        self.append(
+            _extract_col_vals(desc, col)
+            for desc, col in zip(self.row_desc, cols)
+        )
+
+    def append_rows(self, rows):
+        parsers = [
+            (_array_from_string if desc.col_type.is_array else _from_string)
+            for desc in self.row_desc
+        ]
+        typenames = [self._typename(desc) for desc in self.row_desc]
+        columns = [[] for _ in self.row_desc]
+        for row in rows:
+            for i, val in enumerate(row.cols):
+                columns[i].append(
+                    None
+                    if val.is_null
+                    else parsers[i](typenames[i], val.str_val)
+                )
+        self.append(columns)
+
+    def append_arrow(self, arrow_stream):
+        df = pa.ipc.open_stream(arrow_stream).read_all().to_pandas()
+        self.append(
+            [_value(v) for v in df[col].tolist()] for col in df.columns
+        )
+
+    def to_row_set(self):
+        if self._row_set is None:
+            self._row_set = self._encode_row_set()
+        return self._row_set
+
+    def _encode_row_set(self):
+        columns = []
+        for desc, values in zip(self.row_desc, self.columns):
+            typename = self._typename(desc)
+            slot = _typeattr[typename] + '_col'
+            precision = desc.col_type.precision
+            if desc.col_type.is_array:
+                data = TColumnData(
+                    arr_col=[
+                        TColumn(
+                            data=TColumnData(
+                                **{
+                                    slot: [
+                                        _to_slot(typename, precision, x)
+                                        for x in v or []
+                                    ]
+                                }
+                            ),
+                            nulls=[False] * len(v or []),
+                        )
+                        for v in values
+                    ]
+                )
+            else:
+                data = TColumnData(
+                    **{
+                        slot: [
+                            (
+                                _NULL_SLOT[slot]
+                                if v is None
+                                else _to_slot(typename, precision, v)
+                            )
+                            for v in values
+                        ]
+                    }
+                )
+            columns.append(
+                TColumn(data=data, nulls=[v is None for v in values])
+            )
+        return TRowSet(
+            row_desc=self.row_desc, rows=[], columns=columns, is_columnar=True
+        )
+
+    def to_arrow_stream(self):
+        """The table as Arrow IPC stream bytes"""
+        if self._arrow_stream is None:
+            schema = pa.schema(
+                [self._arrow_field(desc) for desc in self.row_desc]
+            )
+            table = pa.Table.from_arrays(
+                [
+                    pa.array(values, type=field.type)
+                    for field, values in zip(schema, self.columns)
+                ],
+                schema=schema,
+            )
+            stream = pa.BufferOutputStream()
+            with pa.RecordBatchStreamWriter(stream, table.schema) as writer:
+                writer.write_table(table)
+            self._arrow_stream = stream.getvalue().to_pybytes()
+        return self._arrow_stream
+
+
+class FakeOmniSciHandler:
+    """
+    Thrift handler implementing the ``OmniSci`` methods the client uses
+
+    With ``sink`` set, the load methods accept the payload for an existing
+    table without decoding or storing it.
+    """
+
+    def __init__(self, user='admin', password='HyperInteractive', sink=False):
+        self.user = user
+        self.password = password
+        self.sink = sink
+        self.sessions = set()
+        self.tables = {}
+        self.results = {}
+        self.calls = []
+
+    def _check_session(self, session):
+        if session not in self.sessions:
+            raise TOmniSciException(error_msg='Session not valid.')
+
+    def _get_table(self, table_name):
+        try:
+            return self.tables[table_name]
+        except KeyError:
+            raise TOmniSciException(
+                error_msg='Table/View {} does not exist.'.format(table_name)
+            )
+
+    def _resolve(self, query):
+        query = _normalize(query)
+        if query in self.results:
+            return self.results[query]
+        match = _SELECT_ALL.match(query)
+        if match:
+            return self._get_table(match.group(1))
+        raise TOmniSciException(
+            error_msg='Query not known to the stand-in server: ' + query
+        )
+
+    def connect(self, user, passwd, dbname):
+        if (user, passwd) != (self.user, self.password):
+            raise TOmniSciException(
+                error_msg='Authentication failure for user ' + user
+            )
+        session = uuid.uuid4().hex
+        self.sessions.add(session)
+        return session
+
+    def disconnect(self, session):
+        self._check_session(session)
+        self.sessions.discard(session)
+
+    def get_version(self):
+        return '5.5.0'
+
+    def get_tables(self, session):
+        self._check_session(session)
+        return list(self.tables)
+
+    def get_table_details(self, session, table_name):
+        self._check_session(session)
+        return TTableDetails(row_desc=self._get_table(table_name).row_desc)
+
+    def create_table(
+        self, session, table_name, row_desc, file_type, create_params
+    ):
+        self._check_session(session)
+        if table_name in self.tables:
+            raise TOmniSciException(
+                error_msg='Table {} already exists.'.format(table_name)
+            )
+        self.tables[table_name] = _Table(row_desc)
+
+    def sql_execute(
+        self, session, query, column_format, nonce, first_n, at_most_n
+    ):
+        self._check_session(session)
+        match = _DROP_TABLE.match(_normalize(query))
+        if match:
+            if match.group(1) is None:
+                self._get_table(match.group(2))
+            self.tables.pop(match.group(2), None)
+            return TQueryResult(
+                row_set=TRowSet(row_desc=[], rows=[], columns=[]),
+                execution_time_ms=0,
+                total_time_ms=0,
+                nonce=nonce,
+            )
+        return TQueryResult(
+            row_set=self._resolve(query).head(first_n).to_row_set(),
+            execution_time_ms=0,
+            total_time_ms=0,
+            nonce=nonce,
+        )
+
+    def sql_execute_df(
+        self, session, query, device_type, device_id, first_n, transport_method
+    ):
+        self._check_session(session)
+        if transport_method != TArrowTransport.WIRE:
+            raise TOmniSciException(
+                error_msg='The stand-in server only supports WIRE transport'
+            )
+        buf = self._resolve(query).head(first_n).to_arrow_stream()
+        return TDataFrame(
+            df_handle=b'', df_size=len(buf), execution_time_ms=0, df_buffer=buf
+        )
+
+    def deallocate_df(self, session, df, device_type, device_id):
+        self._check_session(session)
+
+    def sql_validate(self, session, query):
+        self._check_session(session)
+        return self._resolve(query).row_desc
+
+    def load_table(self, session, table_name, rows, column_names):
+        self._check_session(session)
+        table = self._get_table(table_name)
+        if not self.sink:
+            table.append_rows(rows)
+
+    def load_table_binary_columnar(
+        self, session, table_name, cols, column_names
+    ):
+        self._check_session(session)
+        table = self._get_table(table_name)
+        if not self.sink:
+            table.append_columnar(cols)
+
+    def load_table_binary_arrow(
+        self, session, table_name, arrow_stream, use_column_names
+    ):
+        self._check_session(session)
+        table = self._get_table(table_name)
+        if not self.sink:
+            table.append_arrow(arrow_stream)
+
+
+class _TimedTransport(TTransport.TBufferedTransport):
+    """
+    Buffered transport adding the time since ``started`` to the server's
+    ``server_seconds`` right before a response is sent, so that the count is
+    complete by the time the client has the response
+    """
+
+    def __init__(self, trans, server):
+        super().__init__(trans)
+        self.server = server
+        self.started = None
+
+    def flush(self):
+        if self.started is not None:
+            with self.server._lock:
+                self.server.server_seconds += (
+                    time.perf_counter() - self.started
+                )
+            self.started = None
+        super().flush()
+
+
+class _Processor(OmniSci.Processor):
+    """
+    Processor adding the server latency in front of every call and timing
+    each call from reading its arguments to sending its response
+    """
+
+    def __init__(self, server):
+        super().__init__(server.handler)
+        self._server = server
+        self._processMap = {
+            name: self._instrument(name, process)
+            for name, process in self._processMap.items()
+        }
+
+    def _instrument(self, name, process):
+        server = self._server
+
+        def call(processor, seqid, iprot, oprot):
+            server.handler.calls.append(name)
+            time.sleep(server.latency)
+            oprot.trans.started = time.perf_counter()
+            return process(processor, seqid, iprot, oprot)
+
+        return call
+
+
+class FakeOmniSciServer:
+    """
+    Serve :class:`FakeOmniSciHandler` over the binary protocol from a
+    background thread
+
+    Parameters
+    ----------
+    latency: float, default 0
+        Seconds to sleep before answering each call
+    sink: bool, default False
+        Accept loads without decoding or storing them, see
+        :class:`FakeOmniSciHandler`
+    host: str, default '127.0.0.1'
+    port: int, default 0
+        Port to listen on, 0 picks a free port
+
+    Examples
+    --------
+    >>> with FakeOmniSciServer(latency=0.01) as server:
+    ...     server.add_result('select 1', pd.DataFrame({'a': [1]}))
+    ...     con = connect(user='admin', password='HyperInteractive',
+    ...                   host=server.host, port=server.port)
+    ...     list(con.execute('select 1'))
+    [(1,)]
+    """
+
+    def __init__(self, latency=0.0, sink=False, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.host = host
+        self.handler = FakeOmniSciHandler(sink=sink)
+        # wall time spent serving calls, excluding the latency
+        self.server_seconds = 0.0
+        self._lock = threading.Lock()
+        self._processor = _Processor(self)
+        self._transport = TSocket.TServerSocket(host=host, port=port)
+        self._clients = []
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._transport.handle.getsockname()[1]
+
+    def add_table(self, table_name, df):
+        """Create ``table_name`` holding the contents of ``df``"""
+        self.handler.tables[table_name] = _Table.from_dataframe(df).encode()
+
+    def add_result(self, query, df):
+        """Answer ``query`` with the contents of ``df``"""
+        table = _Table.from_dataframe(df).encode()
+        self.handler.results[_normalize(query)] = table
+
+    def table(self, table_name):
+        """Contents of ``table_name`` as a DataFrame"""
+        table = self.handler.tables[table_name]
+        return pd.DataFrame(
+            {
+                desc.col_name: values
+                for desc, values in zip(table.row_desc, table.columns)
+            }
+        )
+
+    def start(self):
+        self._transport.listen()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        handle = self._transport.handle
+        try:
+            handle.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._transport.close()
+        # shut down rather than close client sockets, so that their serving
+        # threads see end of file and clean up after themselves
+        for client in self._clients:
+            try:
+                client.handle.shutdown(socket.SHUT_RDWR)
+            except (OSError, AttributeError):
+                pass
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _serve(self):
+        while True:
+            try:
+                client = self._transport.accept()
+            except (OSError, AttributeError):
+                # raised once stop() closes the listening socket
+                return
+            if client is None:
+                return
+            self._clients.append(client)
+            threading.Thread(
+                target=self._handle, args=(client,), daemon=True
+            ).start()
+
+    def _handle(self, client):
+        trans = _TimedTransport(client, self)
+        prot = TBinaryProtocol.TBinaryProtocolAccelerated(trans)
+        try:
+            while True:
+                self._processor.process(prot, prot)
+        except (TTransport.TTransportException, OSError):
+            pass
+        finally:
+            trans.close()
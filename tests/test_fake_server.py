@@ -0,0 +1,312 @@
+import datetime
+import gc
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from omnisci.thrift.ttypes import TArrowTransport, TOmniSciException
+from pymapd import OperationalError, connect
+from pymapd._pandas_loaders import build_row_desc
+from pymapd.exceptions import Error
+
+from .fake_server import FakeOmniSciServer
+
+
+def _df():
+    return pd.DataFrame(
+        {
+            'a': np.array([1, 2, 3], dtype='int32'),
+            'b': ['x', None, 'z'],
+            'c': [1.5, 2.5, np.nan],
+            'd': pd.to_datetime(
+                ['2020-01-01 10:00:00', None, '2021-01-01 00:00:00']
+            ),
+            'e': [datetime.date(2020, 1, 2), None, datetime.date(1960, 5, 5)],
+            'f': [datetime.time(1, 2, 3), None, datetime.time(4, 5, 6)],
+        }
+    )
+
+
+class TestFakeServer:
+    def test_connect(self, fake_server, fake_con):
+        assert fake_con._session in fake_server.handler.sessions
+        fake_con.close()
+        assert fake_server.handler.sessions == set()
+
+    def test_bad_credentials(self, fake_server):
+        with pytest.raises(Error):
+            connect(
+                user='admin',
+                password='wrong',
+                host=fake_server.host,
+                port=fake_server.port,
+                dbname='omnisci',
+            )
+
+    def test_session_logon_failure(self, fake_server):
+        with pytest.raises(Error):
+            connect(
+                sessionid='ILoveDancingOnTables',
+                host=fake_server.host,
+                port=fake_server.port,
+            )
+        # the half-initialized Connection disconnects in __del__, make sure
+        # that happens while the server is still up
+        gc.collect()
+
+    def test_execute_canned_result(self, fake_server, fake_con):
+        fake_server.add_result('select * from foo where a > :a', _df())
+        c = fake_con.execute('select * from foo where a > :a')
+        assert [d.name for d in c.description] == list('abcdef')
+        assert list(c) == [
+            (
+                1,
+                'x',
+                1.5,
+                datetime.datetime(2020, 1, 1, 10),
+                datetime.date(2020, 1, 2),
+                datetime.time(1, 2, 3),
+            ),
+            (2, None, 2.5, None, None, None),
+            (
+                3,
+                'z',
+                None,
+                datetime.datetime(2021, 1, 1),
+                datetime.date(1960, 5, 5),
+                datetime.time(4, 5, 6),
+            ),
+        ]
+
+    def test_unknown_query_raises(self, fake_con):
+        with pytest.raises(Error):
+            fake_con.execute('select 1')
+
+    def test_select_ipc(self, fake_server, fake_con):
+        df = _df()
+        fake_server.add_result('select * from foo', df)
+        result = fake_con.select_ipc('select * from foo')
+        pd.testing.assert_frame_equal(
+            result[['a', 'b', 'c', 'd']],
+            df[['a', 'b', 'c', 'd']],
+            check_dtype=False,
+        )
+
+    def test_select_ipc_types(self, fake_server, fake_con):
+        df = _df().assign(g=pd.array([1, None, 3], dtype='Int32'))
+        fake_server.add_table('foo', df)
+        rows = fake_con.execute('select * from foo')
+        assert [row[-1] for row in rows] == [1, None, 3]
+        handler = fake_server.handler
+        result = handler.sql_execute_df(
+            fake_con._session,
+            'select * from foo',
+            0,
+            0,
+            -1,
+            TArrowTransport.WIRE,
+        )
+        table = pa.ipc.open_stream(result.df_buffer).read_all()
+        assert table.schema.types == [
+            pa.int32(),
+            pa.string(),
+            pa.float64(),
+            pa.timestamp('s'),
+            pa.date32(),
+            pa.time64('us'),
+            pa.int32(),
+        ]
+        assert table['g'].to_pylist() == [1, None, 3]
+        assert table['f'].to_pylist() == list(df['f'])
+
+    def test_first_n(self, fake_server, fake_con):
+        fake_server.add_table('foo', _df())
+        assert len(fake_con.select_ipc('select * from foo', first_n=2)) == 2
+
+    @pytest.mark.parametrize('method', ['rows', 'columnar', 'arrow'])
+    def test_load_table(self, fake_server, fake_con, method):
+        df = pd.DataFrame(
+            {
+                'a': np.arange(5, dtype='int32'),
+                'b': list('abcde'),
+                'c': np.linspace(0, 1, 5),
+                'd': pd.date_range('2020-01-01', periods=5, freq='H'),
+            }
+        )
+        fake_con.load_table('foo', df, method=method)
+        pd.testing.assert_frame_equal(
+            fake_server.table('foo'), df, check_dtype=False
+        )
+        assert [x.name for x in fake_con.get_table_details('foo')] == list(
+            'abcd'
+        )
+        assert len(list(fake_con.execute('select * from foo'))) == 5
+
+    def test_load_methods_agree(self, fake_con):
+        df = pd.DataFrame(
+            {
+                'a': np.array([1, 2, 3], dtype='int32'),
+                'b': [True, False, True],
+                'c': pd.to_datetime(
+                    [
+                        '2020-01-01 10:00:00.123456',
+                        '2020-01-02 00:00:00.000000',
+                        '1960-05-05 23:59:59.900000',
+                    ]
+                ),
+                'd': [1.5, 2.5, 3.5],
+                'e': list('xyz'),
+            }
+        )
+        results = []
+        for method in ['rows', 'columnar', 'arrow']:
+            fake_con.create_table(method, df)
+            fake_con.load_table(method, df, create=False, method=method)
+            results.append(
+                fake_con.select_ipc('select * from {}'.format(method))
+            )
+        for result in results[1:]:
+            pd.testing.assert_frame_equal(result, results[0])
+        assert results[0]['b'].dtype == bool
+        # TIMESTAMP(0) keeps whole seconds
+        expected = df.assign(c=df['c'].dt.floor('s'))
+        pd.testing.assert_frame_equal(results[0], expected, check_dtype=False)
+
+    @pytest.mark.parametrize('method', ['rows', 'columnar', 'arrow'])
+    def test_load_table_arrays(self, fake_server, fake_con, method):
+        df = pd.DataFrame(
+            {
+                'a': [[1, 2], [3], [4, 5, 6]],
+                'b': [[1.5], [2.5, 3.5], [4.5]],
+                'c': [['x', 'y'], ['z'], ['w']],
+            }
+        )
+        fake_con.load_table('foo', df, method=method)
+        pd.testing.assert_frame_equal(fake_server.table('foo'), df)
+        assert list(fake_con.execute('select * from foo')) == [
+            ([1, 2], [1.5], ['x', 'y']),
+            ([3], [2.5, 3.5], ['z']),
+            ([4, 5, 6], [4.5], ['w']),
+        ]
+
+    def test_array_results(self, fake_server, fake_con):
+        df = pd.DataFrame({'a': [[1, 2], None, []]})
+        fake_server.add_table('foo', df)
+        assert list(fake_con.execute('select * from foo')) == [
+            ([1, 2],),
+            (None,),
+            ([],),
+        ]
+        result = fake_con.select_ipc('select * from foo')
+        assert [v if v is None else list(v) for v in result['a']] == [
+            [1, 2],
+            None,
+            [],
+        ]
+
+    def test_results_encoded_once(self, fake_server):
+        fake_server.add_table('foo', _df())
+        handler = fake_server.handler
+        session = handler.connect(handler.user, handler.password, 'omnisci')
+        first = handler.sql_execute(session, 'select * from foo', 1, 1, -1, -1)
+        second = handler.sql_execute(
+            session, 'select * from foo', 1, 1, -1, -1
+        )
+        assert first.row_set is second.row_set
+
+    def test_load_invalidates_encoding(self, fake_server, fake_con):
+        df = pd.DataFrame({'a': np.arange(3, dtype='int32')})
+        fake_server.add_table('foo', df)
+        assert len(fake_con.select_ipc('select * from foo')) == 3
+        fake_con.load_table('foo', df, create=False, method='columnar')
+        assert len(fake_con.select_ipc('select * from foo')) == 6
+        assert len(list(fake_con.execute('select * from foo'))) == 6
+
+    @pytest.mark.parametrize('method', ['rows', 'columnar', 'arrow'])
+    def test_sink(self, method):
+        df = pd.DataFrame({'a': np.arange(3, dtype='int32')})
+        with FakeOmniSciServer(sink=True) as server:
+            server.add_table('foo', df)
+            con = connect(
+                user='admin',
+                password='HyperInteractive',
+                host=server.host,
+                port=server.port,
+                dbname='omnisci',
+            )
+            con.load_table('foo', df, create=False, method=method)
+            con.close()
+        assert len(server.table('foo')) == 3
+
+    def test_sink_checks_table(self):
+        handler = FakeOmniSciServer(sink=True).handler
+        session = handler.connect(handler.user, handler.password, 'omnisci')
+        with pytest.raises(TOmniSciException):
+            handler.load_table(session, 'foo', [], [])
+
+    def test_server_seconds(self, fake_server, fake_con):
+        fake_server.add_table('foo', _df())
+        before = fake_server.server_seconds
+        fake_con.execute('select * from foo')
+        assert fake_server.server_seconds > before
+
+    def test_not_null_column(self, fake_server, fake_con):
+        row_desc = build_row_desc(pd.DataFrame({'a': [1], 'b': [2]}))
+        row_desc[0].col_type.nullable = False
+        fake_con._client.create_table(
+            fake_con._session, 'foo', row_desc, None, None
+        )
+        assert [x.nullable for x in fake_con.get_table_details('foo')] == [
+            False,
+            True,
+        ]
+
+    def test_drop_table(self, fake_server, fake_con):
+        fake_server.add_table('foo', _df())
+        assert fake_con.get_tables() == ['foo']
+        fake_con.execute('drop table if exists foo')
+        fake_con.execute('drop table if exists foo')
+        assert fake_con.get_tables() == []
+        with pytest.raises(Error):
+            fake_con.execute('drop table foo')
+
+    def test_sql_validate(self, fake_server, fake_con):
+        fake_server.add_table('foo', _df())
+        row_desc = fake_con._client.sql_validate(
+            fake_con._session, 'select * from foo'
+        )
+        assert [x.col_name for x in row_desc] == list('abcdef')
+
+    def test_latency(self):
+        with FakeOmniSciServer(latency=0.05) as server:
+            server.add_table('foo', _df())
+            con = connect(
+                user='admin',
+                password='HyperInteractive',
+                host=server.host,
+                port=server.port,
+                dbname='omnisci',
+            )
+            start = time.perf_counter()
+            con.execute('select * from foo')
+            assert time.perf_counter() - start >= 0.05
+            con.close()
+        assert server.handler.calls == [
+            'connect',
+            'get_version',
+            'sql_execute',
+            'disconnect',
+        ]
+
+    def test_stopped_server_refuses(self):
+        with FakeOmniSciServer() as server:
+            port = server.port
+        with pytest.raises(OperationalError):
+            connect(
+                user='admin',
+                password='HyperInteractive',
+                host='127.0.0.1',
+                port=port,
+            )
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Wall time in seconds allowed for ``import pymapd``, the eager import of
+# pyomnisci takes well over a second
+IMPORT_BUDGET = 0.25
+
+HEAVY_MODULES = ('pyomnisci', 'pandas', 'pyarrow', 'thrift', 'sqlalchemy')
+
+
+def _run(code):
+    """Run ``code`` in a fresh interpreter and return what it printed"""
+    env = dict(os.environ, DISABLE_PYMAPD_WARNING='1')
+    return subprocess.check_output(
+        [sys.executable, '-c', code], env=env, universal_newlines=True
+    ).split()
+
+
+class TestLazyImport:
+    @pytest.mark.parametrize(
+        'module',
+        [
+            'pymapd',
+            'pymapd.connection',
+            'pymapd.cursor',
+            'pymapd._pandas_loaders',
+        ],
+    )
+    def test_import_is_lazy(self, module):
+        loaded = _run(
+            'import sys\n'
+            'import {}\n'
+            'print(*[m for m in {!r} if m in sys.modules])'.format(
+                module, HEAVY_MODULES
+            )
+        )
+        assert loaded == []
+
+    def test_import_time_budget(self):
+        (elapsed,) = _run(
+            'import time\n'
+            'start = time.perf_counter()\n'
+            'import pymapd\n'
+            'print(time.perf_counter() - start)'
+        )
+        assert float(elapsed) < IMPORT_BUDGET
+
+    def test_names_resolve_on_access(self):
+        pyomnisci = pytest.importorskip('pyomnisci')
+        import pymapd
+        from pymapd.connection import _parse_uri
+        from pymapd.cursor import Cursor, _bind_parameters
+
+        assert pymapd.connect is pyomnisci.connect
+        assert pymapd.Connection is pyomnisci.Connection
+        assert pymapd.Cursor is Cursor is pyomnisci.Cursor
+        assert callable(_parse_uri)
+        assert callable(_bind_parameters)
+        assert 'connect' in dir(pymapd)
+
+    def test_unknown_name_raises(self):
+        import pymapd
+
+        with pytest.raises(AttributeError):
+            pymapd.not_a_real_name